@@ -1,29 +1,33 @@
 import pathlib
 import time
+from contextlib import asynccontextmanager
 from ipaddress import ip_address
 from typing import Callable
 
-import redis.asyncio as redis
 from fastapi import FastAPI, Depends, HTTPException, Request, status
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from starlette.middleware.cors import CORSMiddleware
 from fastapi_limiter import FastAPILimiter
 
-from src.database.db import get_db
+from src.database.db import get_db, engine, redis_client
 from src.routes import clients, auth, users
 from src.conf.config import settings
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the rate limiter shares the connection pool of the cache
+    await FastAPILimiter.init(redis_client)
+    yield
+    await FastAPILimiter.close()
+    await engine.dispose()
 
-@app.on_event("startup")
-async def startup():
-    r = await redis.Redis(host=settings.redis_host, port=settings.redis_port, db=0)
-    await FastAPILimiter.init(r)
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 app.add_middleware(
@@ -67,10 +71,10 @@ async def root(request: Request):
 
 
 @app.get("/api/healthchecker")
-def healthchecker(db: Session = Depends(get_db)):
+async def healthchecker(db: AsyncSession = Depends(get_db)):
     try:
         # Make request
-        result = db.execute(text("SELECT 1")).fetchone()
+        result = (await db.execute(text("SELECT 1"))).fetchone()
         if result is None:
             raise HTTPException(status_code=500, detail="Database is not configured correctly")
         return {"message": "Welcome to FastAPI!"}
@@ -0,0 +1,25 @@
+"""add index clients birthday
+
+Revision ID: 5b1f3a9c2d47
+Revises: 0765436c6b13
+Create Date: 2026-10-14 10:12:41.183524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f3a9c2d47'
+down_revision = '0765436c6b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_clients_birthday_md', 'clients',
+                    [sa.text('EXTRACT(month FROM birthday)'), sa.text('EXTRACT(day FROM birthday)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clients_birthday_md', table_name='clients')
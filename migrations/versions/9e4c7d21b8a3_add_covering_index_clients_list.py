@@ -0,0 +1,28 @@
+"""add covering index clients list
+
+Revision ID: 9e4c7d21b8a3
+Revises: 5b1f3a9c2d47
+Create Date: 2026-10-14 11:05:17.642093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4c7d21b8a3'
+down_revision = '5b1f3a9c2d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_clients_list', 'clients', ['id'], unique=False,
+                    postgresql_include=['first_name', 'last_name', 'email', 'mobile', 'birthday'])
+    # the covering index serves every lookup of the plain id index, keeping both only slows down writes
+    op.drop_index(op.f('ix_clients_id'), table_name='clients')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_clients_id'), 'clients', ['id'], unique=False)
+    op.drop_index('ix_clients_list', table_name='clients')
@@ -1,27 +1,38 @@
 import configparser
 import pathlib
 
+import redis.asyncio as redis
 from fastapi import HTTPException, status
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.conf.config import settings
 
 URI = settings.sqlalchemy_database_url
+# migrations keep the sync driver from URI, the application talks to postgres through asyncpg
+ASYNC_URI = make_url(URI).set(drivername='postgresql+asyncpg')
 
 
-engine = create_engine(URI, echo=True)
-DBSession = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# pool_size is per worker process: keep workers * (pool_size + max_overflow) below postgres max_connections
+engine = create_async_engine(ASYNC_URI, echo=True,
+                             pool_size=settings.db_pool_size,
+                             max_overflow=settings.db_max_overflow,
+                             pool_timeout=settings.db_pool_timeout,
+                             pool_recycle=settings.db_pool_recycle,
+                             pool_pre_ping=True)
+DBSession = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port, db=0)
 
 
 # Dependency
-def get_db():
+async def get_db():
     db = DBSession()
     try:
         yield db
     except SQLAlchemyError as err:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
     finally:
-        db.close()
\ No newline at end of file
+        await db.close()
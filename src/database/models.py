@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, func, event, Date, Enum
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, func, event, Date, Enum, Index, extract
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -14,16 +14,22 @@ class Role(enum.Enum):
 
 class Client(Base):
     __tablename__ = "clients"
-    id = Column(Integer, primary_key=True, index=True)
-    first_name = Column(String, index=True)
-    last_name = Column(String, index=True)
-    email = Column(String, unique=True, index=True)
-    mobile = Column(String, index=True)
+    id = Column(Integer, primary_key=True)
+    first_name = Column(String(64), index=True)
+    last_name = Column(String(64), index=True)
+    email = Column(String(150), unique=True, index=True)
+    mobile = Column(String(20), index=True)
     birthday = Column(Date)
-    add_info = Column(String)
+    add_info = Column(String(1024))
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ix_clients_birthday_md', extract('month', birthday), extract('day', birthday)),
+        Index('ix_clients_list', id,
+              postgresql_include=['first_name', 'last_name', 'email', 'mobile', 'birthday']),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
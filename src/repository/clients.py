@@ -1,69 +1,226 @@
-from sqlalchemy.orm import Session
+import calendar
+from datetime import date, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+
+from asyncpg import PostgresError, UniqueViolationError
+from sqlalchemy import extract, tuple_, select, insert, update as sql_update, func, bindparam, exists
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from src.schemas import ClientModel
 from src.database.models import Client
+from src.services.cache import cache
+
+# built once at import, the email lookup is executed only with new parameters
+client_by_email_stmt = select(Client).where(Client.email == bindparam('email'))
+
 
+async def get_clients(limit: int, cursor: Optional[int], db: AsyncSession) -> Tuple[List[Client], Optional[int]]:
+    """
+    The get_clients function returns a page of clients ordered by id (keyset pagination).
+    Only the columns shown in the list view are loaded, the rest stay deferred.
+    One extra row is fetched to tell whether there is a next page.
 
-async def get_clients(db: Session):
+    :param limit: int: Limit the number of clients returned
+    :param cursor: Optional[int]: Return only clients with id greater than the cursor
+    :param db: AsyncSession: Pass the database session into the function
+    :return: A list of client objects and the cursor of the next page, None on the last page
+    :doc-author: Trelent
     """
-    The get_clients function returns a list of all clients in the database.
+    stmt = select(Client).options(load_only(Client.id, Client.first_name, Client.last_name, Client.email,
+                                            Client.mobile, Client.birthday))
+    if cursor is not None:
+        stmt = stmt.filter(Client.id > cursor)
+    result = await db.execute(stmt.order_by(Client.id).limit(limit + 1))
+    clients = result.scalars().all()
+    if len(clients) > limit:
+        clients = clients[:limit]
+        return clients, clients[-1].id
+    return clients, None
 
 
-    :param db: Session: Pass the database session into the function
-    :return: A list of client objects
+async def stream_clients(db: AsyncSession) -> AsyncIterator[Client]:
+    """
+    The stream_clients function yields all clients in the database ordered by id.
+    Rows are fetched from a server side cursor in batches of 500,
+    so only one batch is kept in memory at a time.
+
+    :param db: AsyncSession: Pass the database session into the function
+    :return: An async iterator of client objects
     :doc-author: Trelent
     """
-    clients = db.query(Client).all()
-    return clients
+    stmt = select(Client).order_by(Client.id).execution_options(yield_per=500)
+    result = await db.stream_scalars(stmt)
+    async for client in result:
+        yield client
 
 
-async def get_client_by_id(client_id: int, db: Session):
+async def get_client_by_id(client_id: int, db: AsyncSession):
     """
-    The get_client_by_id function takes in a client_id and db Session object,
+    The get_client_by_id function takes in a client_id and db AsyncSession object,
     and returns the Client object with that id. If no such Client exists, it returns None.
 
     :param client_id: int: Filter the client by id
-    :param db: Session: Pass the database session to the function
+    :param db: AsyncSession: Pass the database session to the function
     :return: A client by its id
     :doc-author: Trelent
     """
-    client = db.query(Client).filter_by(id=client_id).first()
+    client = await db.get(Client, client_id)
     return client
 
 
-async def get_client_by_email(email: str, db: Session):
+async def get_client_by_email(email: str, db: AsyncSession):
     """
     The get_client_by_email function takes in an email and a database session,
     and returns the client with that email. If no such client exists, it returns None.
 
     :param email: str: Pass in the email of the client to be found
-    :param db: Session: Access the database
+    :param db: AsyncSession: Access the database
     :return: A client object
     :doc-author: Trelent
     """
-    client = db.query(Client).filter_by(email=email).first()
-    return client
+    result = await db.execute(client_by_email_stmt, {'email': email})
+    return result.scalar_one_or_none()
+
+
+async def email_exists(email: str, db: AsyncSession) -> bool:
+    """
+    The email_exists function checks whether a client with the given email is already in the database.
+    Only a single boolean is fetched from the database instead of the whole client row.
+
+    :param email: str: Pass in the email to be checked
+    :param db: AsyncSession: Access the database
+    :return: True if the email is taken
+    :doc-author: Trelent
+    """
+    return await db.scalar(select(exists().where(Client.email == email)))
+
+
+async def get_existing_emails(emails: List[str], db: AsyncSession) -> List[str]:
+    """
+    The get_existing_emails function takes in a list of emails and a database session,
+    and returns those of the emails which already belong to clients.
+
+    :param emails: List[str]: Pass in the emails to be checked
+    :param db: AsyncSession: Access the database
+    :return: A list of emails which are already taken
+    :doc-author: Trelent
+    """
+    if not emails:
+        return []
+    result = await db.execute(select(Client.email).filter(Client.email.in_(emails)))
+    return result.scalars().all()
 
 
-async def create(body: ClientModel, db: Session):
+async def get_clients_by_birthday(start_date: date, end_date: date, db: AsyncSession):
+    """
+    The get_clients_by_birthday function returns a list of clients whose birthdays (month and day)
+    fall within the specified date range. The range may cross the end of the year.
+    In a common year clients born on February 29 are matched on February 28.
+    The (month, day) pairs of the range are computed in Python, so the database runs a single IN query
+    which can use the ix_clients_birthday_md index.
+
+    :param start_date: date: Set the start date of the range
+    :param end_date: date: Set the end date of the range
+    :param db: AsyncSession: Pass the database session into the function
+    :return: A list of client objects
+    :doc-author: Trelent
+    """
+    days_count = min((end_date - start_date).days + 1, 366)
+    dates = (start_date + timedelta(days=i) for i in range(days_count))
+    days = set()
+    for day in dates:
+        days.add((day.month, day.day))
+        if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+            days.add((2, 29))
+    days = sorted(days)
+    if not days:
+        return []
+    result = await db.execute(select(Client).filter(
+        tuple_(extract('month', Client.birthday), extract('day', Client.birthday)).in_(days)
+    ))
+    return result.scalars().all()
+
+
+async def create(body: ClientModel, db: AsyncSession):
     """
     The create function creates a new client in the database.
         Args:
             body (ClientModel): The client to create.
 
     :param body: ClientModel: Define the body of the request
-    :param db: Session: Access the database and perform operations on it
+    :param db: AsyncSession: Access the database and perform operations on it
     :return: The client object, which is the same as the body
     :doc-author: Trelent
     """
-    client = Client(**body.dict())
+    client = Client(**body.model_dump())
     db.add(client)
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
+    await cache.invalidate("clients")
     return client
 
 
-async def update(client_id: int, body: ClientModel, db: Session):
+async def create_many(bodies: List[ClientModel], db: AsyncSession):
+    """
+    The create_many function creates many clients in the database at once.
+    All rows are sent in a single INSERT statement (batched by insertmanyvalues), instead of one per client.
+
+    :param bodies: List[ClientModel]: Pass the clients to be created
+    :param db: AsyncSession: Access the database and perform operations on it
+    :return: A list of the created client objects, in the order of the bodies
+    :doc-author: Trelent
+    """
+    if not bodies:
+        return []
+    # insertmanyvalues batches may return rows in any order, the caller matches them to the bodies by position
+    stmt = insert(Client).returning(Client, sort_by_parameter_order=True)
+    result = await db.scalars(stmt, [body.model_dump() for body in bodies])
+    clients = result.all()
+    await db.commit()
+    await cache.invalidate("clients")
+    return clients
+
+
+async def bulk_copy_clients(bodies: List[ClientModel], db: AsyncSession) -> Optional[int]:
+    """
+    The bulk_copy_clients function imports many clients into the database with the PostgreSQL COPY protocol.
+    It is faster than INSERT for very large imports, but works with PostgreSQL (asyncpg) only
+    and does not return the created rows. If any email is already taken, nothing is imported and None is returned.
+
+    :param bodies: List[ClientModel]: Pass the clients to be imported
+    :param db: AsyncSession: Access the database and perform operations on it
+    :return: The number of imported clients, or None if an email is already taken
+    :doc-author: Trelent
+    """
+    if not bodies:
+        return 0
+    # COPY bypasses the column defaults, so timestamps are filled in explicitly
+    now = await db.scalar(select(func.localtimestamp()))
+    records = [(body.first_name, body.last_name, body.email, body.mobile, body.birthday, body.add_info, now, now)
+               for body in bodies]
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    try:
+        await raw_connection.driver_connection.copy_records_to_table(
+            Client.__tablename__,
+            records=records,
+            columns=('first_name', 'last_name', 'email', 'mobile', 'birthday', 'add_info', 'created_at', 'updated_at'),
+        )
+    except UniqueViolationError:
+        await db.rollback()
+        return None
+    except PostgresError as err:
+        await db.rollback()
+        # the raw driver call bypasses SQLAlchemy, wrap its errors so get_db handles them like any other
+        raise SQLAlchemyError(str(err)) from err
+    await db.commit()
+    await cache.invalidate("clients")
+    return len(records)
+
+
+async def update(client_id: int, body: ClientModel, db: AsyncSession):
     """
     The update function updates a client in the database.
         Args:
@@ -72,36 +229,36 @@ async def update(client_id: int, body: ClientModel, db: Session):
 
     :param client_id: int: Identify the client to be deleted
     :param body: ClientModel: Pass the client data to be updated
-    :param db: Session: Access the database
+    :param db: AsyncSession: Access the database
     :return: The client object
     :doc-author: Trelent
     """
-    client = await get_client_by_id(client_id, db)
+    stmt = sql_update(Client).where(Client.id == client_id).values(**body.model_dump()).returning(Client)
+    result = await db.execute(stmt)
+    client = result.scalar_one_or_none()
+    await db.commit()
     if client:
-        client.first_name = body.first_name
-        client.last_name = body.last_name
-        client.email = body.email
-        client.mobile = body.mobile
-        client.birthday = body.birthday
-        client.add_info = body.add_info
-        db.commit()
+        await cache.delete(f"client:{client_id}")
+        await cache.invalidate("clients")
     return client
 
 
-async def remove(client_id: int, db: Session):
+async def remove(client_id: int, db: AsyncSession):
     """
     The remove function removes a client from the database.
         Args:
             client_id (int): The id of the client to be removed.
-            db (Session): A connection to the database.
+            db (AsyncSession): A connection to the database.
 
     :param client_id: int: Specify the client id of the client to be removed
-    :param db: Session: Pass the database session into the function
+    :param db: AsyncSession: Pass the database session into the function
     :return: The client that was removed
     :doc-author: Trelent
     """
     client = await get_client_by_id(client_id, db)
     if client:
-        db.delete(client)
-        db.commit()
+        await db.delete(client)
+        await db.commit()
+        await cache.delete(f"client:{client_id}")
+        await cache.invalidate("clients")
     return client
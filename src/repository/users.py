@@ -1,86 +1,93 @@
 from libgravatar import Gravatar
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from src.database.models import User
 from src.schemas import UserModel
+from src.services.cache import cache
 
 
-async def get_user_by_email(email: str, db: Session) -> User | None:
+async def get_user_by_email(email: str, db: AsyncSession) -> User | None:
     """
     The get_user_by_email function takes in an email and a database session,
     and returns the user with that email if it exists. If no such user exists,
     it returns None.
 
     :param email: str: Specify the type of data that is passed into the function
-    :param db: Session: Pass the database session to the function
+    :param db: AsyncSession: Pass the database session to the function
     :return: A user object or none if the user does not exist
     :doc-author: Trelent
     """
-    return db.query(User).filter_by(email=email).first()
+    # raiseload makes any relationship added to User later fail loudly instead of lazy loading (N+1)
+    result = await db.execute(select(User).options(raiseload('*')).where(User.email == email))
+    return result.scalar_one_or_none()
 
 
-async def create_user(body: UserModel, db: Session):
+async def create_user(body: UserModel, db: AsyncSession):
     """
     The create_user function creates a new user in the database.
 
     :param body: UserModel: Specify the type of data that is expected to be passed in
-    :param db: Session: Pass in the database session
+    :param db: AsyncSession: Pass in the database session
     :return: A user object
     :doc-author: Trelent
     """
     g = Gravatar(body.email)
-    new_user = User(**body.dict(), avatar=g.get_image())
+    new_user = User(**body.model_dump(), avatar=g.get_image())
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
-async def update_token(user: User, refresh_token, db: Session):
+async def update_token(user: User, refresh_token, db: AsyncSession):
     """
     The update_token function updates the refresh token for a user in the database.
         Args:
             user (User): The User object to update.
             refresh_token (str): The new refresh token to store in the database.
-            db (Session): A connection to our Postgres database.
+            db (AsyncSession): A connection to our Postgres database.
 
     :param user: User: Pass the user object to the function
     :param refresh_token: Update the user's refresh token in the database
-    :param db: Session: Pass the database session to the function
+    :param db: AsyncSession: Pass the database session to the function
     :return: The user object
     :doc-author: Trelent
     """
     user.refresh_token = refresh_token
-    db.commit()
+    await db.commit()
 
 
-async def confirmed_email(email: str, db: Session) -> None:
+async def confirmed_email(email: str, db: AsyncSession) -> None:
     """
     The confirmed_email function takes in an email and a database session,
     and sets the confirmed field of the user with that email to True.
 
 
     :param email: str: Get the email of the user
-    :param db: Session: Access the database
+    :param db: AsyncSession: Access the database
     :return: None
     :doc-author: Trelent
     """
     user = await get_user_by_email(email, db)
     user.confirmed = True
-    db.commit()
+    await db.commit()
+    await cache.delete(f"user:{email}")
 
 
-async def update_avatar(email, url: str, db: Session) -> User:
+async def update_avatar(email, url: str, db: AsyncSession) -> User:
     """
     The update_avatar function updates the avatar of a user.
 
     :param email: Find the user in the database
     :param url: str: Specify the type of data that will be passed into the function
-    :param db: Session: Pass a database session to the function
+    :param db: AsyncSession: Pass a database session to the function
     :return: The user object with the updated avatar url
     :doc-author: Trelent
     """
     user = await get_user_by_email(email, db)
     user.avatar = url
-    db.commit()
+    await db.commit()
+    await cache.delete(f"user:{email}")
     return user
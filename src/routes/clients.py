@@ -1,16 +1,18 @@
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional
 
-from fastapi import Depends, HTTPException, status, Path, APIRouter, Query
+import orjson
+from fastapi import Depends, HTTPException, status, Path, APIRouter, Query, Body
+from fastapi.responses import StreamingResponse
 from fastapi_limiter.depends import RateLimiter
-from sqlalchemy import extract
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas import ClientResponse, ClientModel
+from src.schemas import ClientResponse, ClientPage, ClientModel
 from src.database.db import get_db
-from src.database.models import Client, User, Role
+from src.database.models import User, Role
 from src.repository import clients as repository_clients
 from src.services.auth import auth_service
+from src.services.cache import cache, seconds_until_midnight
 from src.services.roles import RoleAccess
 
 router = APIRouter(prefix="/clients", tags=['clients'])
@@ -19,58 +21,105 @@ allowed_operation_get = RoleAccess([Role.admin, Role.moderator, Role.user])
 allowed_operation_create = RoleAccess([Role.admin, Role.moderator, Role.user])
 allowed_operation_update = RoleAccess([Role.admin, Role.moderator])
 allowed_operation_remove = RoleAccess([Role.admin])
+allowed_operation_import = RoleAccess([Role.admin])
 
+rate_limit_get = RateLimiter(times=2, seconds=5)
 
-@router.get("/", response_model=List[ClientResponse], name="All clients:",
-            dependencies=[Depends(allowed_operation_get), Depends(RateLimiter(times=2, seconds=5))])
-async def get_clients(db: Session = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
+# one request body is validated and kept in memory as a whole, so its size is bounded
+BULK_MAX_CLIENTS = 1000
+IMPORT_MAX_CLIENTS = 10000
+
+
+@router.get("/", response_model=ClientPage, name="All clients:",
+            dependencies=[Depends(allowed_operation_get), Depends(rate_limit_get)])
+@cache.cached(key=lambda limit, cursor, **_: f"{cursor}:{limit}", ttl=60, namespace="clients")
+async def get_clients(limit: int = Query(default=50, ge=1, le=500), cursor: Optional[int] = Query(default=None, ge=0),
+                      db: AsyncSession = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
     """
-    The get_clients function returns a list of all clients in the database.
+    The get_clients function returns a page of clients ordered by id.
         The function is called by sending a GET request to the /clients endpoint.
+        To get the next page, pass the next_cursor of the response as the cursor parameter;
+        next_cursor is None on the last page.
 
-    :param db: Session: Access the database
+    :param limit: int: Set the maximum number of clients on the page
+    :param cursor: Optional[int]: Return only clients with id greater than the cursor
+    :param db: AsyncSession: Access the database
     :param current_user: User: Get the current user
-    :return: A list of clients
+    :return: A page of clients with the cursor of the next page
     :doc-author: Trelent
     """
-    clients = await repository_clients.get_clients(db)
-    return clients
+    clients, next_cursor = await repository_clients.get_clients(limit, cursor, db)
+    return ClientPage(items=clients, next_cursor=next_cursor)
+
+
+@cache.cached(key=lambda start_date, end_date, db: f"birthday:{start_date}:{end_date}",
+              ttl=seconds_until_midnight, schema=ClientResponse, namespace="clients")
+async def cached_clients_by_birthday(start_date: date, end_date: date, db: AsyncSession):
+    return await repository_clients.get_clients_by_birthday(start_date, end_date, db)
 
 
 @router.get("/birthday", response_model=List[ClientResponse], name="Congratulate:",
             dependencies=[Depends(allowed_operation_get)])
-async def get_clients_by_birth_date(start_date: date = Query(default=date.today()),
-                                    end_date: date = Query(default=(date.today() + timedelta(days=7))),
-                                    db: Session = Depends(get_db),
+async def get_clients_by_birth_date(start_date: Optional[date] = Query(default=None),
+                                    end_date: Optional[date] = Query(default=None),
+                                    db: AsyncSession = Depends(get_db),
                                     current_user: User = Depends(auth_service.get_current_user)):
     """
     The get_clients_by_birth_date function returns a list of clients whose birthdays fall within the specified date range.
-    The start_date and end_date parameters are optional, with default values of today and seven days from today respectively.
+    The start_date and end_date parameters are optional, with default values of today and seven days from start_date respectively.
+    The result is cached until midnight, or until any client is changed.
 
 
     :param start_date: date: Set the start date of the range
     :param end_date: date: Specify the end date of the range
-    :param db: Session: Get the database session
+    :param db: AsyncSession: Get the database session
     :param current_user: User: Get the current user from the database
     :return: All clients with birthdays between the start_date and end_date
     :doc-author: Trelent
     """
-    clients = db.query(Client).filter(extract('day', Client.birthday) >= start_date.day,
-                                      extract('month', Client.birthday) >= start_date.month,
-                                      extract('day', Client.birthday) <= end_date.day,
-                                      extract('month', Client.birthday) <= end_date.month).all()
+    start_date = start_date or date.today()
+    end_date = end_date or start_date + timedelta(days=7)
+    clients = await cached_clients_by_birthday(start_date, end_date, db)
     return clients
 
 
+@router.get("/export", response_class=StreamingResponse, name="Export clients:",
+            dependencies=[Depends(allowed_operation_get)])
+async def export_clients(db: AsyncSession = Depends(get_db),
+                         current_user: User = Depends(auth_service.get_current_user)):
+    """
+    The export_clients function returns all clients in the database as a streamed JSON array.
+    Clients are encoded one by one while they are read from the database,
+    so memory usage does not grow with the number of clients.
+
+    :param db: AsyncSession: Get the database session
+    :param current_user: User: Get the current user from the database
+    :return: A streaming response with the list of clients
+    :doc-author: Trelent
+    """
+    async def generate():
+        yield b'['
+        first = True
+        async for client in repository_clients.stream_clients(db):
+            if not first:
+                yield b','
+            yield orjson.dumps(ClientResponse.model_validate(client).model_dump())
+            first = False
+        yield b']'
+
+    return StreamingResponse(generate(), media_type='application/json')
+
+
 @router.get("/{client_id}", response_model=ClientResponse, dependencies=[Depends(allowed_operation_get)])
-async def get_client(client_id: int = Path(ge=1), db: Session = Depends(get_db),
+@cache.cached(key=lambda client_id, **_: f"client:{client_id}", ttl=60, schema=ClientResponse)
+async def get_client(client_id: int = Path(ge=1), db: AsyncSession = Depends(get_db),
                      current_user: User = Depends(auth_service.get_current_user)):
     """
     The get_client function is a GET request that returns the client with the given ID.
     If no client exists with that ID, it will return a 404 error.
 
     :param client_id: int: Define the path parameter
-    :param db: Session: Get the database session
+    :param db: AsyncSession: Get the database session
     :param current_user: User: Get the current user from the auth_service
     :return: A client object
     :doc-author: Trelent
@@ -83,7 +132,7 @@ async def get_client(client_id: int = Path(ge=1), db: Session = Depends(get_db),
 
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(allowed_operation_create)], description='Only moderators and admin')
-async def create_client(body: ClientModel, db: Session = Depends(get_db),
+async def create_client(body: ClientModel, db: AsyncSession = Depends(get_db),
                         current_user: User = Depends(auth_service.get_current_user)):
     """
     The create_client function creates a new client in the database.
@@ -91,20 +140,68 @@ async def create_client(body: ClientModel, db: Session = Depends(get_db),
         The function returns the newly created client object.
 
     :param body: ClientModel: Validate the data that is sent in the request body
-    :param db: Session: Pass a database session to the function
+    :param db: AsyncSession: Pass a database session to the function
     :param current_user: User: Get the current user from the database
     :return: A clientmodel object
     :doc-author: Trelent
     """
-    client = await repository_clients.get_client_by_email(body.email, db)
-    if client:
+    if await repository_clients.email_exists(body.email, db):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Email is exists!')
     client = await repository_clients.create(body, db)
     return client
 
 
+@router.post("/bulk", response_model=List[ClientResponse], status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(allowed_operation_create)])
+async def create_clients(bodies: List[ClientModel] = Body(max_length=BULK_MAX_CLIENTS),
+                         db: AsyncSession = Depends(get_db),
+                         current_user: User = Depends(auth_service.get_current_user)):
+    """
+    The create_clients function creates many clients in the database with a single INSERT statement.
+    If any email is repeated in the request body or already exists in the database, nothing is created.
+    At most BULK_MAX_CLIENTS clients are accepted in one request.
+
+    :param bodies: List[ClientModel]: Validate the list of clients that is sent in the request body
+    :param db: AsyncSession: Pass a database session to the function
+    :param current_user: User: Get the current user from the database
+    :return: A list of created clients
+    :doc-author: Trelent
+    """
+    emails = [body.email for body in bodies]
+    if len(set(emails)) != len(emails) or await repository_clients.get_existing_emails(emails, db):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Email is exists!')
+    clients = await repository_clients.create_many(bodies, db)
+    return clients
+
+
+@router.post("/import", status_code=status.HTTP_201_CREATED, dependencies=[Depends(allowed_operation_import)],
+             description='Only admin')
+async def import_clients(bodies: List[ClientModel] = Body(max_length=IMPORT_MAX_CLIENTS),
+                         db: AsyncSession = Depends(get_db),
+                         current_user: User = Depends(auth_service.get_current_user)):
+    """
+    The import_clients function imports a large list of clients with the PostgreSQL COPY protocol.
+    Unlike create_clients, it does not look up existing emails beforehand and does not return the created clients:
+    an email which is already taken fails the whole import.
+    At most IMPORT_MAX_CLIENTS clients are accepted in one request.
+
+    :param bodies: List[ClientModel]: Validate the list of clients that is sent in the request body
+    :param db: AsyncSession: Pass a database session to the function
+    :param current_user: User: Get the current user from the database
+    :return: A message with the number of imported clients
+    :doc-author: Trelent
+    """
+    emails = {body.email for body in bodies}
+    if len(emails) != len(bodies):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Email is exists!')
+    count = await repository_clients.bulk_copy_clients(bodies, db)
+    if count is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Email is exists!')
+    return {"message": f"Imported {count} clients"}
+
+
 @router.put("/{client_id}", response_model=ClientResponse, dependencies=[Depends(allowed_operation_update)])
-async def update_client(body: ClientModel, client_id: int = Path(ge=1), db: Session = Depends(get_db),
+async def update_client(body: ClientModel, client_id: int = Path(ge=1), db: AsyncSession = Depends(get_db),
                         current_user: User = Depends(auth_service.get_current_user)):
     # user = db.query(User).filter_by(id=user_id).first()
     """
@@ -114,7 +211,7 @@ async def update_client(body: ClientModel, client_id: int = Path(ge=1), db: Sess
 
     :param body: ClientModel: Get the body of the request
     :param client_id: int: Get the client id from the url
-    :param db: Session: Access the database
+    :param db: AsyncSession: Access the database
     :param current_user: User: Get the current user from the database
     :return: A clientmodel object
     :doc-author: Trelent
@@ -126,7 +223,7 @@ async def update_client(body: ClientModel, client_id: int = Path(ge=1), db: Sess
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(allowed_operation_remove)])
-async def remove_client(client_id: int = Path(ge=1), db: Session = Depends(get_db),
+async def remove_client(client_id: int = Path(ge=1), db: AsyncSession = Depends(get_db),
                         current_user: User = Depends(auth_service.get_current_user)):
     """
     The remove_client function removes a client from the database.
@@ -136,7 +233,7 @@ async def remove_client(client_id: int = Path(ge=1), db: Session = Depends(get_d
             - current_user is used for authentication purposes; only users with admin privileges are allowed to remove clients.
 
     :param client_id: int: Specify the client id that will be used to remove a client
-    :param db: Session: Pass the database session to the repository
+    :param db: AsyncSession: Pass the database session to the repository
     :param current_user: User: Get the user that is currently logged in
     :return: The removed client
     :doc-author: Trelent
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 import cloudinary
 import cloudinary.uploader
 
@@ -27,7 +28,7 @@ async def read_users_me(current_user: User = Depends(auth_service.get_current_us
 
 @router.patch('/avatar', response_model=UserResponse)
 async def update_avatar_user(file: UploadFile = File(), current_user: User = Depends(auth_service.get_current_user),
-                             db: Session = Depends(get_db)):
+                             db: AsyncSession = Depends(get_db)):
     # cloudinary.config(
     #     cloud_name=settings.cloudinary_name,
     #     api_key=settings.cloudinary_api_key,
@@ -42,12 +43,13 @@ async def update_avatar_user(file: UploadFile = File(), current_user: User = Dep
 
     :param file: UploadFile: Get the file from the request
     :param current_user: User: Get the current user's email
-    :param db: Session: Get the database session
+    :param db: AsyncSession: Get the database session
     :return: A user object
     :doc-author: Trelent
     """
     public_id = f'HW13/{current_user.username}'
-    r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
+    # the upload is a blocking HTTP call, run it in the threadpool to keep the event loop free
+    r = await run_in_threadpool(cloudinary.uploader.upload, file.file, public_id=public_id, overwrite=True)
     src_url = cloudinary.CloudinaryImage(public_id)\
                         .build_url(width=250, height=250, crop='fill', version=r.get('version'))
     user = await repository_users.update_avatar(current_user.email, src_url, db)
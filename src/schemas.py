@@ -1,31 +1,48 @@
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 from src.database.models import Role
 
 
 class ClientModel(BaseModel):
+    first_name: str = Field(max_length=64)
+    last_name: str = Field(max_length=64)
+    email: EmailStr = Field(max_length=150)
+    mobile: str = Field(max_length=20)
+    birthday: date
+    add_info: str = Field(max_length=1024)
+
+
+class ClientResponse(BaseModel):
+    id: int = 1
     first_name: str
     last_name: str
     email: EmailStr
     mobile: str
     birthday: date
     add_info: str
+    created_at: datetime
+    updated_at: datetime
 
+    model_config = ConfigDict(from_attributes=True)
 
-class ClientResponse(BaseModel):
+
+class ClientListResponse(BaseModel):
     id: int = 1
     first_name: str
     last_name: str
     email: EmailStr
     mobile: str
     birthday: date
-    add_info: str
-    created_at: datetime
-    updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ClientPage(BaseModel):
+    items: List[ClientListResponse]
+    next_cursor: Optional[int] = None
 
 
 class UserModel(BaseModel):
@@ -41,8 +58,18 @@ class UserResponse(BaseModel):
     avatar: str
     roles: Role
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserCache(BaseModel):
+    id: int
+    username: Optional[str] = None
+    email: str
+    avatar: Optional[str] = None
+    roles: Role
+    confirmed: bool
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TokenModel(BaseModel):
@@ -1,29 +1,47 @@
-import pickle
+import hashlib
+import hmac
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-import redis as redis
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer  # Bearer token
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
+from pydantic import ValidationError
 
 
 from src.database.db import get_db
+from src.database.models import User
 from src.repository import users as repository_users
 from src.conf.config import settings
+from src.schemas import UserCache
+from src.services.cache import cache
 
 
 class Auth:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     SECRET_KEY = settings.secret_key
     ALGORITHM = settings.algorithm
+    PASSWORD_CACHE_KEY = settings.password_cache_key
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-    r = redis.Redis(host=settings.redis_host, port=settings.redis_port, db=0)
-
-    def verify_password(self, plain_password, hashed_password):
-        return self.pwd_context.verify(plain_password, hashed_password)
+    USER_CACHE_TTL = 300
+    PASSWORD_CACHE_TTL = 15 * 60
+
+    async def verify_password(self, plain_password, hashed_password):
+        # bcrypt is slow by design: remember successful checks for the lifetime of an access token.
+        # The key is an HMAC with its own secret, so neither the password nor its hash is stored in Redis
+        # and the JWT signing key is not reused
+        cache_key = "password:" + hmac.new(self.PASSWORD_CACHE_KEY.encode(),
+                                           f"{plain_password}:{hashed_password}".encode(), hashlib.sha256).hexdigest()
+        if await cache.get(cache_key):
+            return True
+        verified = await run_in_threadpool(self.pwd_context.verify, plain_password, hashed_password)
+        if verified:
+            await cache.set(cache_key, True, ex=self.PASSWORD_CACHE_TTL)
+        return verified
 
     def get_password_hash(self, password: str):
         return self.pwd_context.hash(password)
@@ -50,7 +68,7 @@ class Auth:
         encoded_refresh_token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
         return encoded_refresh_token
 
-    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -69,21 +87,31 @@ class Auth:
         except JWTError as e:
             raise credentials_exception
 
-        user = await repository_users.get_user_by_email(email, db)
-        # user = self.r.get(f"user:{email}")
-        # if user is None:
-        #     user = await repository_users.get_user_by_email(email, db)
-        #     if user is None:
-        #         raise credentials_exception
-        #     self.r.set(f"user:{email}", pickle.dumps(user))
-        #     self.r.expire(f"user:{email}", 900)
-        # else:
-        #     user = pickle.loads(user)
+        cache_key = f"user:{email}"
+        user = self.user_from_cache(await cache.get(cache_key))
+        if user is not None:
+            return user
 
+        user = await repository_users.get_user_by_email(email, db)
         if user is None:
             raise credentials_exception
+        # never keep the user in the cache longer than the token itself is valid
+        ttl = min(self.USER_CACHE_TTL, int(payload["exp"] - time.time()))
+        if ttl > 0:
+            # only the public fields are cached, the password hash and the refresh token stay in the database
+            await cache.set(cache_key, UserCache.model_validate(user).model_dump(), ex=ttl)
         return user
 
+    @staticmethod
+    def user_from_cache(value) -> Optional[User]:
+        if value is None:
+            return None
+        try:
+            return User(**UserCache.model_validate(value).model_dump())
+        except ValidationError:
+            # a value of an unexpected shape is treated as a cache miss
+            return None
+
     async def decode_refresh_token(self, refresh_token: str):
         try:
             payload = jwt.decode(refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
@@ -0,0 +1,116 @@
+import functools
+from datetime import datetime, time, timedelta
+from typing import Callable, List, Optional, Type, Union
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from redis.exceptions import RedisError
+
+from src.database.db import redis_client
+
+
+def seconds_until_midnight() -> int:
+    tomorrow = datetime.combine(datetime.now().date() + timedelta(days=1), time())
+    return max(int((tomorrow - datetime.now()).total_seconds()), 1)
+
+
+@functools.lru_cache
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    # building a TypeAdapter compiles a validator, do it once per schema
+    return TypeAdapter(List[schema])
+
+
+class Cache:
+    r = redis_client
+
+    async def get(self, key: str):
+        try:
+            value = await self.r.get(key)
+        except RedisError:
+            # cache is an optimisation only, fall back to the database
+            return None
+        if value is None:
+            return None
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            # a value which is not JSON (e.g. written by an older version of the code) is treated as a miss
+            return None
+
+    async def set(self, key: str, value, ex: int = 60):
+        try:
+            # JSON, not pickle: loading a value from Redis must never be able to run code
+            await self.r.set(key, orjson.dumps(value), ex=ex)
+        except RedisError:
+            pass
+
+    async def delete(self, *keys: str):
+        try:
+            await self.r.delete(*keys)
+        except RedisError:
+            pass
+
+    async def version(self, namespace: str) -> Optional[int]:
+        try:
+            return int(await self.r.get(f"{namespace}:version") or 0)
+        except RedisError:
+            return None
+
+    async def invalidate(self, namespace: str):
+        # a single INCR makes every key built with the previous version unreachable, they expire by their ttl
+        try:
+            await self.r.incr(f"{namespace}:version")
+        except RedisError:
+            pass
+
+    def cached(self, key: Callable[..., str], ttl: Union[int, Callable[[], int]] = 60,
+               schema: Optional[Type[BaseModel]] = None, namespace: Optional[str] = None):
+        """
+        The cached decorator stores the result of an async function in Redis under the key built by ``key``
+        from the call arguments. Pydantic models, as well as ORM objects when ``schema`` is given, are converted
+        to plain dicts first, so only JSON serializable data is put to the cache. None results are not cached.
+        Dates and enums come back from the cache as strings, the response model validates them again.
+        Keys of a ``namespace`` include its current version, so ``invalidate(namespace)`` drops all of them at once.
+
+        :param key: Callable[..., str]: Build the cache key from the arguments of the decorated function
+        :param ttl: Union[int, Callable[[], int]]: Set the time to live of the cached value in seconds,
+            a callable is called on every write
+        :param schema: Type[BaseModel]: Convert the result to a dict before caching
+        :param namespace: str: Group the keys so they can be invalidated together
+        :return: A decorator
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                cache_key = key(*args, **kwargs)
+                if namespace is not None:
+                    version = await self.version(namespace)
+                    if version is None:
+                        # Redis is unavailable, go straight to the database
+                        return await func(*args, **kwargs)
+                    cache_key = f"{namespace}:{version}:{cache_key}"
+                value = await self.get(cache_key)
+                if value is not None:
+                    return value
+                result = await func(*args, **kwargs)
+                if result is None:
+                    return result
+                value = self._dump(result, schema)
+                await self.set(cache_key, value, ex=ttl() if callable(ttl) else ttl)
+                return value
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _dump(result, schema: Optional[Type[BaseModel]]):
+        if isinstance(result, BaseModel):
+            return result.model_dump()
+        if schema is None:
+            return result
+        if isinstance(result, list):
+            adapter = _list_adapter(schema)
+            return adapter.dump_python(adapter.validate_python(result, from_attributes=True))
+        return schema.model_validate(result).model_dump()
+
+
+cache = Cache()
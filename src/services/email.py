@@ -10,7 +10,7 @@ from src.conf.config import settings
 conf = ConnectionConfig(
     MAIL_USERNAME=settings.mail_username,
     MAIL_PASSWORD=settings.mail_password,
-    MAIL_FROM=EmailStr(settings.mail_from),
+    MAIL_FROM=settings.mail_from,
     MAIL_PORT=settings.redis_port,
     MAIL_SERVER=settings.mail_server,
     MAIL_FROM_NAME="Clients App",
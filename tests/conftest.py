@@ -1,11 +1,17 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from main import app
-from src.database.models import Base
+from src.database.models import Base, Client
 from src.database.db import get_db
+from src.services.cache import cache
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -15,6 +21,16 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient runs every request in its own event loop, so async connections must not be pooled
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def bulk_add(db, model, rows):
+    # one executemany and one commit for the whole batch instead of a flush per object
+    db.bulk_insert_mappings(model, rows)
+    db.commit()
+
 
 @pytest.fixture(scope="module")
 def session():
@@ -34,17 +50,40 @@ def session():
 def client(session):
     # Dependency override
 
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
 
-    yield TestClient(app)
+    # an in-memory Redis per module, so the tests neither depend on nor touch a locally running Redis
+    storage = {}
+    redis_mock = AsyncMock()
+    redis_mock.get.side_effect = storage.get
+    redis_mock.set.side_effect = lambda key, value, ex=None: storage.update({key: value})
+    redis_mock.delete.side_effect = lambda *keys: [storage.pop(key, None) for key in keys]
+    redis_mock.incr.side_effect = lambda key: storage.update({key: int(storage.get(key, 0)) + 1})
+
+    with patch.object(cache, "r", redis_mock):
+        yield TestClient(app)
 
 
 @pytest.fixture(scope="module")
 def user():
-    return {"username": "deadpool", "email": "deadpool@example.com", "password": "12345678"}
\ No newline at end of file
+    return {"username": "deadpool", "email": "deadpool@example.com", "password": "12345678"}
+
+
+@pytest.fixture(scope="module")
+def clients(session):
+    rows = [
+        {"first_name": "Peter", "last_name": "Parker", "email": "peter@example.com", "mobile": "+380501112233",
+         "birthday": datetime.date(2001, 12, 30), "add_info": "spider"},
+        {"first_name": "Tony", "last_name": "Stark", "email": "tony@example.com", "mobile": "+380501112234",
+         "birthday": datetime.date(1970, 1, 2), "add_info": "iron"},
+        {"first_name": "Bruce", "last_name": "Banner", "email": "bruce@example.com", "mobile": "+380501112235",
+         "birthday": datetime.date(1969, 6, 15), "add_info": "hulk"},
+        {"first_name": "Wanda", "last_name": "Maximoff", "email": "wanda@example.com", "mobile": "+380501112236",
+         "birthday": datetime.date(1988, 2, 29), "add_info": "witch"},
+    ]
+    bulk_add(session, Client, rows)
+    return rows
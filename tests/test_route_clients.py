@@ -0,0 +1,86 @@
+import pytest
+
+from main import app
+from src.database.models import User, Role
+from src.routes.clients import rate_limit_get, BULK_MAX_CLIENTS
+from src.services.auth import auth_service
+
+
+@pytest.fixture(scope="module", autouse=True)
+def admin():
+    current_user = User(id=1, username="admin", email="admin@example.com", roles=Role.admin)
+    app.dependency_overrides[auth_service.get_current_user] = lambda: current_user
+    yield current_user
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+@pytest.fixture()
+def no_rate_limit():
+    app.dependency_overrides[rate_limit_get] = lambda: None
+    yield
+    del app.dependency_overrides[rate_limit_get]
+
+
+def test_get_clients_pages(client, clients, no_rate_limit):
+    response = client.get("/api/clients/", params={"limit": 3})
+    assert response.status_code == 200, response.text
+    first_page = response.json()
+    assert [item["email"] for item in first_page["items"]] == [row["email"] for row in clients[:3]]
+    assert first_page["next_cursor"] is not None
+
+    response = client.get("/api/clients/", params={"limit": 3, "cursor": first_page["next_cursor"]})
+    assert response.status_code == 200, response.text
+    last_page = response.json()
+    assert [item["email"] for item in last_page["items"]] == [row["email"] for row in clients[3:]]
+    assert last_page["next_cursor"] is None
+
+
+def test_get_clients_pages_exact_multiple(client, clients, no_rate_limit):
+    response = client.get("/api/clients/", params={"limit": 2})
+    assert response.status_code == 200, response.text
+    first_page = response.json()
+    assert [item["email"] for item in first_page["items"]] == [row["email"] for row in clients[:2]]
+    assert first_page["next_cursor"] is not None
+
+    response = client.get("/api/clients/", params={"limit": 2, "cursor": first_page["next_cursor"]})
+    assert response.status_code == 200, response.text
+    last_page = response.json()
+    assert [item["email"] for item in last_page["items"]] == [row["email"] for row in clients[2:]]
+    assert last_page["next_cursor"] is None
+
+
+def test_get_clients_by_birthday_across_new_year(client, clients):
+    response = client.get("/api/clients/birthday", params={"start_date": "2023-12-28", "end_date": "2024-01-03"})
+    assert response.status_code == 200, response.text
+    payload = response.json()
+    assert sorted(item["email"] for item in payload) == ["peter@example.com", "tony@example.com"]
+
+
+def test_get_clients_by_birthday_february_29(client, clients):
+    response = client.get("/api/clients/birthday", params={"start_date": "2023-02-27", "end_date": "2023-02-28"})
+    assert response.status_code == 200, response.text
+    assert [item["email"] for item in response.json()] == ["wanda@example.com"]
+
+    response = client.get("/api/clients/birthday", params={"start_date": "2024-02-27", "end_date": "2024-02-28"})
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+
+
+def test_export_clients(client, clients):
+    response = client.get("/api/clients/export")
+    assert response.status_code == 200, response.text
+    payload = response.json()
+    assert [item["email"] for item in payload] == [row["email"] for row in clients]
+
+
+def test_create_client_email_exists(client, clients):
+    body = {**clients[0], "birthday": str(clients[0]["birthday"])}
+    response = client.post("/api/clients/", json=body)
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == "Email is exists!"
+
+
+def test_create_clients_too_many(client, clients):
+    body = {**clients[0], "birthday": str(clients[0]["birthday"])}
+    response = client.post("/api/clients/bulk", json=[body] * (BULK_MAX_CLIENTS + 1))
+    assert response.status_code == 422, response.text
@@ -1,38 +1,67 @@
 import datetime
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock, patch
 
-from sqlalchemy.orm import Session
+from asyncpg import UniqueViolationError, PostgresError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Client, User
-from src.repository.clients import get_clients, get_client_by_id, get_client_by_email, create, update, remove
+from src.repository.clients import get_clients, get_client_by_id, get_client_by_email, get_clients_by_birthday, \
+    email_exists, get_existing_emails, create, create_many, bulk_copy_clients, update, remove
 from src.schemas import ClientModel
 
 
 class TestClientsRepository(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
         self.client = Client(id=1, email='test@test.com')
 
     async def test_get_clients(self):
         clients = [Client(), Client(), Client()]
-        self.session.query(Client).all.return_value = clients
-        result = await get_clients(db=self.session)
-        self.assertEqual(result, clients)
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = clients
+        self.session.execute.return_value = result
+        result = await get_clients(limit=50, cursor=None, db=self.session)
+        self.assertEqual(result, (clients, None))
+
+    async def test_get_clients_next_page(self):
+        clients = [Client(id=1), Client(id=2), Client(id=3)]
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = clients
+        self.session.execute.return_value = result
+        result = await get_clients(limit=2, cursor=None, db=self.session)
+        self.assertEqual(result, (clients[:2], 2))
 
     async def test_get_client_by_id(self):
         client = Client()
-        self.session.query(Client).filter_by(client_id=1).first.return_value = client
+        self.session.get.return_value = client
         result = await get_client_by_id(client_id=1, db=self.session)
         self.assertEqual(result, client)
 
     async def test_get_client_by_email(self):
         client = Client()
-        self.session.query(Client).filter_by(email="test@test.com").first.return_value = client
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = client
+        self.session.execute.return_value = result
         result = await get_client_by_email(email="test@test.com", db=self.session)
         self.assertEqual(result, client)
 
+    async def test_get_clients_by_birthday(self):
+        clients = [Client(), Client()]
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = clients
+        self.session.execute.return_value = result
+        result = await get_clients_by_birthday(start_date=datetime.date(2023, 12, 28),
+                                               end_date=datetime.date(2024, 1, 3), db=self.session)
+        self.assertEqual(result, clients)
+
+    async def test_get_clients_by_birthday_empty_range(self):
+        result = await get_clients_by_birthday(start_date=datetime.date(2024, 1, 3),
+                                               end_date=datetime.date(2023, 12, 28), db=self.session)
+        self.assertEqual(result, [])
+
     async def test_create(self):
         body = ClientModel(
             first_name="test",
@@ -52,6 +81,70 @@ class TestClientsRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.add_info, body.add_info)
         self.assertTrue(hasattr(result, "id"))
 
+    async def test_create_many(self):
+        clients = [Client(), Client()]
+        bodies = [
+            ClientModel(first_name="test", last_name="TEST", email=f"test{i}@test.com", mobile="+380501112233",
+                        birthday=datetime.date(2020, 1, 1), add_info="qwerty")
+            for i in range(2)
+        ]
+        self.session.scalars.return_value = MagicMock(all=MagicMock(return_value=clients))
+        result = await create_many(bodies, self.session)
+        self.assertEqual(result, clients)
+        self.session.commit.assert_awaited_once()
+
+    async def test_email_exists(self):
+        self.session.scalar.return_value = True
+        result = await email_exists(email="test@test.com", db=self.session)
+        self.assertTrue(result)
+
+    async def test_get_existing_emails(self):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = ["test@test.com"]
+        self.session.execute.return_value = result
+        emails = await get_existing_emails(["test@test.com", "other@test.com"], db=self.session)
+        self.assertEqual(emails, ["test@test.com"])
+
+    async def test_bulk_copy_clients(self):
+        bodies = [
+            ClientModel(first_name="test", last_name="TEST", email=f"test{i}@test.com", mobile="+380501112233",
+                        birthday=datetime.date(2020, 1, 1), add_info="qwerty")
+            for i in range(3)
+        ]
+        driver_connection = AsyncMock()
+        connection = AsyncMock()
+        connection.get_raw_connection.return_value = MagicMock(driver_connection=driver_connection)
+        self.session.connection.return_value = connection
+        result = await bulk_copy_clients(bodies, self.session)
+        self.assertEqual(result, 3)
+        driver_connection.copy_records_to_table.assert_awaited_once()
+        self.assertEqual(len(driver_connection.copy_records_to_table.call_args.kwargs["records"]), 3)
+
+    async def test_bulk_copy_clients_email_exists(self):
+        body = ClientModel(first_name="test", last_name="TEST", email="test@test.com", mobile="+380501112233",
+                           birthday=datetime.date(2020, 1, 1), add_info="qwerty")
+        driver_connection = AsyncMock()
+        driver_connection.copy_records_to_table.side_effect = UniqueViolationError
+        connection = AsyncMock()
+        connection.get_raw_connection.return_value = MagicMock(driver_connection=driver_connection)
+        self.session.connection.return_value = connection
+        result = await bulk_copy_clients([body], self.session)
+        self.assertIsNone(result)
+        self.session.rollback.assert_awaited_once()
+        self.session.commit.assert_not_awaited()
+
+    async def test_bulk_copy_clients_driver_error(self):
+        body = ClientModel(first_name="test", last_name="TEST", email="test@test.com", mobile="+380501112233",
+                           birthday=datetime.date(2020, 1, 1), add_info="qwerty")
+        driver_connection = AsyncMock()
+        driver_connection.copy_records_to_table.side_effect = PostgresError("connection lost")
+        connection = AsyncMock()
+        connection.get_raw_connection.return_value = MagicMock(driver_connection=driver_connection)
+        self.session.connection.return_value = connection
+        with self.assertRaises(SQLAlchemyError):
+            await bulk_copy_clients([body], self.session)
+        self.session.rollback.assert_awaited_once()
+
     async def test_update(self):
         body_update = ClientModel(
             first_name="test_update",
@@ -62,6 +155,9 @@ class TestClientsRepository(unittest.IsolatedAsyncioTestCase):
             add_info="qwerty_update"
         )
         user = User(id=1)
+        updated = MagicMock()
+        updated.scalar_one_or_none.return_value = Client(id=1, **body_update.model_dump())
+        self.session.execute.return_value = updated
         result = await update(client_id=1, body=body_update, db=self.session)
         self.assertEqual(result.first_name, body_update.first_name)
         self.assertEqual(result.last_name, body_update.last_name)
@@ -70,15 +166,52 @@ class TestClientsRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.birthday, body_update.birthday)
         self.assertEqual(result.add_info, body_update.add_info)
 
+    async def test_update_not_found(self):
+        body_update = ClientModel(
+            first_name="test_update",
+            last_name="TEST_update",
+            email="test@test.com",
+            mobile="+380501112233_update",
+            birthday=datetime.date(2020, 1, 1),
+            add_info="qwerty_update"
+        )
+        updated = MagicMock()
+        updated.scalar_one_or_none.return_value = None
+        self.session.execute.return_value = updated
+        result = await update(client_id=1, body=body_update, db=self.session)
+        self.assertIsNone(result)
+
     async def test_remove(self):
         client = Client()
-        self.session.query(Client).filter_by(client_id=1).first.return_value = client
+        self.session.get.return_value = client
         result = await remove(client_id=1, db=self.session)
         self.assertEqual(result, client)
 
 
+class TestClientsInvalidation(unittest.IsolatedAsyncioTestCase):
 
+    def setUp(self):
+        self.session = AsyncMock(spec=AsyncSession)
+        self.body = ClientModel(first_name="test", last_name="TEST", email="test@test.com", mobile="+380501112233",
+                                birthday=datetime.date(2020, 1, 1), add_info="qwerty")
+        cache_patch = patch("src.repository.clients.cache", new_callable=AsyncMock)
+        self.cache = cache_patch.start()
+        self.addCleanup(cache_patch.stop)
 
+    async def test_create(self):
+        await create(self.body, self.session)
+        self.cache.invalidate.assert_awaited_once_with("clients")
 
+    async def test_update(self):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = Client(id=1)
+        self.session.execute.return_value = result
+        await update(client_id=1, body=self.body, db=self.session)
+        self.cache.delete.assert_awaited_once_with("client:1")
+        self.cache.invalidate.assert_awaited_once_with("clients")
 
-
+    async def test_remove(self):
+        self.session.get.return_value = Client(id=1)
+        await remove(client_id=1, db=self.session)
+        self.cache.delete.assert_awaited_once_with("client:1")
+        self.cache.invalidate.assert_awaited_once_with("clients")
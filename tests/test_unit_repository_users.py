@@ -1,9 +1,10 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from src.database.models import User
+from src.database.models import Base, User, Role
 from src.repository.users import get_user_by_email, create_user
 from src.schemas import UserModel
 
@@ -11,13 +12,15 @@ from src.schemas import UserModel
 class TestUsersRepository(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = AsyncMock(spec=AsyncSession)
         # self.client = Client(id=1, email='test@test.com')
         self.user = User(id=1, email='user@test.com')
 
     async def test_get_user_by_email(self):
         user = User()
-        self.session.query(User).filter_by(email='user@test.com').first.return_value = user
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = user
+        self.session.execute.return_value = result
         result = await get_user_by_email(email='user@test.com', db=self.session)
         self.assertEqual(result, user)
 
@@ -30,3 +33,25 @@ class TestUsersRepository(unittest.IsolatedAsyncioTestCase):
         result = await create_user(body, self.session)
         self.assertEqual(result.username, body.username)
 
+
+class TestUsersRepositoryQueries(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = AsyncSession(self.engine, expire_on_commit=False)
+        self.session.add(User(username="test_user", email="user@test.com", password="12345678"))
+        await self.session.commit()
+        self.session.expunge_all()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def test_get_user_by_email_single_query(self):
+        statements = []
+        event.listen(self.engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        user = await get_user_by_email(email="user@test.com", db=self.session)
+        self.assertEqual((user.username, user.avatar, user.roles, user.confirmed), ("test_user", None, Role.user, False))
+        self.assertEqual(len(statements), 1)
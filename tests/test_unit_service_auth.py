@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import orjson
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import User, Role
+from src.services.auth import auth_service
+from src.services.cache import Cache
+
+
+class TestGetCurrentUser(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.session = AsyncMock(spec=AsyncSession)
+        self.user = User(id=1, username="test_user", email="user@test.com", password="hash", refresh_token="refresh",
+                         avatar="avatar", roles=Role.user, confirmed=True)
+        self.token = await auth_service.create_access_token(data={"sub": self.user.email})
+        self.payload = {"id": 1, "username": "test_user", "email": "user@test.com", "avatar": "avatar",
+                        "roles": Role.user, "confirmed": True}
+        cache_patch = patch("src.services.auth.cache", new_callable=AsyncMock)
+        repository_patch = patch("src.services.auth.repository_users.get_user_by_email", new_callable=AsyncMock)
+        self.cache = cache_patch.start()
+        self.get_user_by_email = repository_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.addCleanup(repository_patch.stop)
+
+    async def test_cache_miss(self):
+        self.cache.get.return_value = None
+        self.get_user_by_email.return_value = self.user
+        result = await auth_service.get_current_user(self.token, self.session)
+        self.assertIs(result, self.user)
+        self.cache.set.assert_awaited_once_with("user:user@test.com", self.payload, ex=auth_service.USER_CACHE_TTL)
+
+    async def test_cache_hit(self):
+        # the cache returns JSON, so the role comes back as a string
+        self.cache.get.return_value = orjson.loads(orjson.dumps(self.payload))
+        result = await auth_service.get_current_user(self.token, self.session)
+        self.get_user_by_email.assert_not_awaited()
+        self.cache.set.assert_not_awaited()
+        self.assertEqual((result.id, result.email, result.roles, result.confirmed), (1, "user@test.com", Role.user, True))
+        self.assertIsNone(result.password)
+        self.assertIsNone(result.refresh_token)
+
+    async def test_invalid_cache_value_is_a_miss(self):
+        self.cache.get.return_value = {"id": 1}
+        self.get_user_by_email.return_value = self.user
+        result = await auth_service.get_current_user(self.token, self.session)
+        self.assertIs(result, self.user)
+        self.get_user_by_email.assert_awaited_once()
+
+    async def test_ttl_capped_by_token_expiration(self):
+        token = await auth_service.create_access_token(data={"sub": self.user.email}, expires_delta=60)
+        self.cache.get.return_value = None
+        self.get_user_by_email.return_value = self.user
+        await auth_service.get_current_user(token, self.session)
+        ttl = self.cache.set.call_args.kwargs["ex"]
+        self.assertTrue(0 < ttl <= 60)
+
+
+class TestVerifyPassword(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        storage = {}
+        self.cache = Cache()
+        self.cache.r = AsyncMock()
+        self.cache.r.get.side_effect = storage.get
+        self.cache.r.set.side_effect = lambda key, value, ex: storage.update({key: value})
+        cache_patch = patch("src.services.auth.cache", self.cache)
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.hashed_password = auth_service.get_password_hash("12345678")
+
+    async def test_second_login_skips_bcrypt(self):
+        self.assertTrue(await auth_service.verify_password("12345678", self.hashed_password))
+        with patch.object(auth_service.pwd_context, "verify") as verify:
+            self.assertTrue(await auth_service.verify_password("12345678", self.hashed_password))
+        verify.assert_not_called()
+
+    async def test_wrong_password_not_cached(self):
+        self.assertFalse(await auth_service.verify_password("password", self.hashed_password))
+        self.cache.r.set.assert_not_awaited()
+        with patch.object(auth_service.pwd_context, "verify", return_value=False) as verify:
+            self.assertFalse(await auth_service.verify_password("password", self.hashed_password))
+        verify.assert_called_once_with("password", self.hashed_password)
+
+    async def test_cache_key_does_not_contain_password(self):
+        await auth_service.verify_password("12345678", self.hashed_password)
+        key = self.cache.r.set.call_args.args[0]
+        self.assertNotIn("12345678", key)
+        self.assertNotIn(self.hashed_password, key)
@@ -0,0 +1,113 @@
+import datetime
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import orjson
+
+from redis.exceptions import RedisError
+
+from src.database.models import Client
+from src.schemas import ClientListResponse
+from src.services.cache import Cache, seconds_until_midnight
+
+
+class TestCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = Cache()
+        self.cache.r = AsyncMock()
+        self.cache.r.get.return_value = None
+        self.func = AsyncMock()
+
+    async def test_key_built_from_kwargs(self):
+        self.func.return_value = {"id": 1}
+        cached = self.cache.cached(key=lambda client_id, **_: f"client:{client_id}", ttl=30)(self.func)
+        result = await cached(client_id=1, db=None)
+        self.assertEqual(result, {"id": 1})
+        self.cache.r.get.assert_awaited_once_with("client:1")
+        self.cache.r.set.assert_awaited_once_with("client:1", orjson.dumps({"id": 1}), ex=30)
+
+    async def test_cache_hit(self):
+        self.cache.r.get.return_value = orjson.dumps({"id": 1})
+        cached = self.cache.cached(key=lambda client_id: f"client:{client_id}")(self.func)
+        result = await cached(client_id=1)
+        self.assertEqual(result, {"id": 1})
+        self.func.assert_not_awaited()
+
+    async def test_none_not_cached(self):
+        self.func.return_value = None
+        cached = self.cache.cached(key=lambda client_id: f"client:{client_id}")(self.func)
+        result = await cached(client_id=1)
+        self.assertIsNone(result)
+        self.cache.r.set.assert_not_awaited()
+
+    async def test_schema_dump_single(self):
+        client = Client(id=1, first_name="test", last_name="TEST", email="test@test.com", mobile="+380501112233",
+                        birthday=datetime.date(2020, 1, 1))
+        self.func.return_value = client
+        cached = self.cache.cached(key=lambda: "client", schema=ClientListResponse)(self.func)
+        result = await cached()
+        self.assertEqual(result, ClientListResponse.model_validate(client).model_dump())
+
+    async def test_schema_dump_list(self):
+        clients = [Client(id=i, first_name="test", last_name="TEST", email=f"test{i}@test.com",
+                          mobile="+380501112233", birthday=datetime.date(2020, 1, 1)) for i in range(2)]
+        self.func.return_value = clients
+        cached = self.cache.cached(key=lambda: "clients", schema=ClientListResponse)(self.func)
+        result = await cached()
+        self.assertEqual(result, [ClientListResponse.model_validate(client).model_dump() for client in clients])
+
+    async def test_dates_come_back_as_strings(self):
+        client = Client(id=1, first_name="test", last_name="TEST", email="test@test.com", mobile="+380501112233",
+                        birthday=datetime.date(2020, 1, 1))
+        self.cache.r.get.return_value = orjson.dumps(ClientListResponse.model_validate(client).model_dump())
+        result = await self.cache.get("client:1")
+        self.assertEqual(result["birthday"], "2020-01-01")
+        self.assertEqual(ClientListResponse.model_validate(result).birthday, client.birthday)
+
+    async def test_redis_error_fallback(self):
+        self.cache.r.get.side_effect = RedisError
+        self.cache.r.set.side_effect = RedisError
+        self.func.return_value = {"id": 1}
+        cached = self.cache.cached(key=lambda: "client")(self.func)
+        result = await cached()
+        self.assertEqual(result, {"id": 1})
+        self.func.assert_awaited_once()
+
+    async def test_not_json_is_a_miss(self):
+        self.cache.r.get.return_value = b"\x80\x04not json"
+        result = await self.cache.get("client:1")
+        self.assertIsNone(result)
+
+    async def test_namespace_version_in_key(self):
+        self.cache.r.get.side_effect = [b"3", None]
+        self.func.return_value = {"id": 1}
+        cached = self.cache.cached(key=lambda: "page", namespace="clients")(self.func)
+        await cached()
+        self.cache.r.set.assert_awaited_once_with("clients:3:page", orjson.dumps({"id": 1}), ex=60)
+
+    async def test_callable_ttl(self):
+        self.func.return_value = {"id": 1}
+        cached = self.cache.cached(key=lambda: "birthday", ttl=seconds_until_midnight)(self.func)
+        await cached()
+        ttl = self.cache.r.set.call_args.kwargs["ex"]
+        self.assertTrue(0 < ttl <= 24 * 60 * 60)
+
+    async def test_invalidate(self):
+        await self.cache.invalidate("clients")
+        self.cache.r.incr.assert_awaited_once_with("clients:version")
+
+
+class TestSecondsUntilMidnight(unittest.TestCase):
+
+    def test_seconds_until_midnight(self):
+        with patch("src.services.cache.datetime") as mock_datetime:
+            mock_datetime.now.return_value = datetime.datetime(2024, 1, 1, 23, 59, 30)
+            mock_datetime.combine = datetime.datetime.combine
+            self.assertEqual(seconds_until_midnight(), 30)
+
+    def test_seconds_until_midnight_at_least_one(self):
+        with patch("src.services.cache.datetime") as mock_datetime:
+            mock_datetime.now.return_value = datetime.datetime(2024, 1, 1, 23, 59, 59, 999999)
+            mock_datetime.combine = datetime.datetime.combine
+            self.assertEqual(seconds_until_midnight(), 1)